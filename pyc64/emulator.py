@@ -195,9 +195,9 @@ class EmulatorWindowBase(tkinter.Tk):
                 self.canvas.coords(self.border4, bc4_new)
         # characters
         prefix = "char-sh" if self.screen.shifted else "char"
-        dirty = self.screen.getdirty()
+        indexes, chars, colors = self.screen.getdirty()
         screencolor = self.tkcolor(self.screen.screen)
-        for index, (char, color) in dirty:
+        for index, char, color in zip(indexes, chars, colors):
             forecol = self.tkcolor(color)
             bm = self.charbitmaps[index]
             bitmap = "@{:s}/{:s}-{:02x}.xbm".format(self.temp_graphics_folder, prefix, char)
@@ -335,6 +335,16 @@ class C64EmulatorWindow(EmulatorWindowBase):
     def __init__(self, screen, title, roms_directory, run_real_roms):
         super().__init__(screen, title, roms_directory)
         self.screen.memory[0x00fb] = EmulatorWindowBase.update_rate
+        # pick the joystick key mapping for this platform once, instead of on every key event
+        if sys.platform == "darwin":
+            # OSX numkeys are problematic, I try to solve this via raw keycode
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_osx, "keycode"
+        elif sys.platform == "win32":
+            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_windows_keycode, "keycode"
+        else:
+            # sane platforms (Linux for one) play nice and just use the friendly keysym name.
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_sane_platforms, "keysym"
         self.hertztick = threading.Event()
         self.interpret_thread = None
         self.interpreter = None
@@ -421,36 +431,16 @@ class C64EmulatorWindow(EmulatorWindowBase):
 
     def keyrelease(self, event):
         # first check special control keys
-        if sys.platform == "darwin":
-            # OSX numkeys are problematic, I try to solve this via raw keycode
-            if event.keycode in self.joystick_keys_osx:
-                self.screen.setjoystick(**{self.joystick_keys_osx[event.keycode]: False})
-                return
-        elif sys.platform == "win32":
-            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
-            if event.keycode in self.joystick_keys_windows_keycode:
-                self.screen.setjoystick(**{self.joystick_keys_windows_keycode[event.keycode]: False})
-                return
-        # sane platforms (Linux for one) play nice and just use the friendly keysym name.
-        elif event.keysym in self.joystick_keys_sane_platforms:
-            self.screen.setjoystick(**{self.joystick_keys_sane_platforms[event.keysym]: False})
+        switch = self.joystick_keys.get(getattr(event, self.joystick_key_attr))
+        if switch:
+            self.screen.setjoystick(**{switch: False})
             return
 
     def keypress(self, event):
         # first check special control keys
-        if sys.platform == "darwin":
-            # OSX numkeys are problematic, I try to solve this via raw keycode
-            if event.keycode in self.joystick_keys_osx:
-                self.screen.setjoystick(**{self.joystick_keys_osx[event.keycode]: True})
-                return
-        elif sys.platform == "win32":
-            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
-            if event.keycode in self.joystick_keys_windows_keycode:
-                self.screen.setjoystick(**{self.joystick_keys_windows_keycode[event.keycode]: True})
-                return
-        # sane platforms (Linux for one) play nice and just use the friendly keysym name.
-        elif event.keysym in self.joystick_keys_sane_platforms:
-            self.screen.setjoystick(**{self.joystick_keys_sane_platforms[event.keysym]: True})
+        switch = self.joystick_keys.get(getattr(event, self.joystick_key_attr))
+        if switch:
+            self.screen.setjoystick(**{switch: True})
             return
         # turn the event into a bit more managable key character
         char = event.char
@@ -10,11 +10,11 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: MIT open-source.
 """
 
+import re
 import math
 import time
 import struct
 import codecs
-from collections import defaultdict
 # noinspection PyUnresolvedReferences
 import cbmcodecs2
 
@@ -43,6 +43,21 @@ def _codec_errors_pyc64specials(error):
 codecs.register_error("pyc64specials", _codec_errors_pyc64specials)
 
 
+_nonzero_byte = re.compile(b"[^\x00]")
+
+
+def _diff_pack(chars, colors, prev_chars, prev_colors):
+    # returns the changed indexes and their new chars and colors.
+    # the planes are xor-ed as big integers into a mask, then the mask is scanned for its nonzero bytes.
+    if chars == prev_chars and colors == prev_colors:
+        return [], b"", b""
+    size = len(chars)
+    mask = ((int.from_bytes(chars, "big") ^ int.from_bytes(prev_chars, "big")) |
+            (int.from_bytes(colors, "big") ^ int.from_bytes(prev_colors, "big"))).to_bytes(size, "big")
+    indexes = [match.start() for match in _nonzero_byte.finditer(mask)]
+    return indexes, bytes(map(chars.__getitem__, indexes)), bytes(map(colors.__getitem__, indexes))
+
+
 class Memory:
     """
     A memoryblock (bytes) with read/write intercept possibility,
@@ -51,60 +66,68 @@ class Memory:
     def __init__(self, size=0x10000, endian="little"):
         self.size = size
         self.mem = bytearray(size)
+        self._mv = memoryview(self.mem)     # for raw block moves without intermediate copies
         self.hooked_reads = bytearray(size)   # 'bitmap' of addresses that have read-hooks, for fast checking
         self.hooked_writes = bytearray(size)  # 'bitmap' of addresses that have write-hooks, for fast checking
         self.rom_areas = set()     # set of tuples (start, end) addresses of ROM (read-only) areas
         self.endian = endian     # 'little' or 'big', affects the way 16-bit words are read/written
-        self.write_hooks = defaultdict(list)
-        self.read_hooks = defaultdict(list)
+        e = "<" if endian == "little" else ">"
+        self._word, self._sword = struct.Struct(e + "H"), struct.Struct(e + "h")
+        self._long, self._slong = struct.Struct(e + "I"), struct.Struct(e + "i")
+        self.write_hooks = {}    # address -> list of hook functions, only for hooked addresses
+        self.read_hooks = {}     # address -> list of hook functions, only for hooked addresses
 
     def __len__(self):
         return self.size
 
     def clear(self):
         """set all memory values to 0."""
-        for a in range(0, 0x10000):
-            self[a] = 0
+        # zero the unhooked runs in bulk, and the hooked addresses one by one (in address order)
+        start = 0
+        while start < self.size:
+            addr = self.hooked_writes.find(1, start)
+            if addr < 0:
+                self[start:self.size] = 0
+                return
+            if addr > start:
+                self[start:addr] = 0
+            self[addr] = 0
+            start = addr + 1
 
     def getword(self, address, signed=False):
         """get a 16-bit (2 bytes) value from memory, no aligning restriction"""
-        e = "<" if self.endian == "little" else ">"
-        s = "h" if signed else "H"
-        return struct.unpack(e + s, self[address:address + 2])[0]
+        return (self._sword if signed else self._word).unpack(self[address:address + 2])[0]
 
     def setword(self, address, value, signed=False):
         """write a 16-bit (2 bytes) value to memory, no aligning restriction"""
-        e = "<" if self.endian == "little" else ">"
-        s = "h" if signed else "H"
-        self[address:address + 2] = struct.pack(e + s, value)
+        self[address:address + 2] = (self._sword if signed else self._word).pack(value)
 
     def getlong(self, address, signed=False):
         """get a 32-bit (4 bytes) value from memory, no aligning restriction"""
-        e = "<" if self.endian == "little" else ">"
-        s = "i" if signed else "I"
-        return struct.unpack(e + s, self[address:address + 4])[0]
+        return (self._slong if signed else self._long).unpack(self[address:address + 4])[0]
 
     def setlong(self, address, value, signed=False):
         """write a 32-bit (4 bytes) value to memory, no aligning restriction"""
-        e = "<" if self.endian == "little" else ">"
-        s = "i" if signed else "I"
-        self[address:address + 4] = struct.pack(e + s, value)
+        self[address:address + 4] = (self._slong if signed else self._long).pack(value)
 
     def __getitem__(self, addr_or_slice):
         """get the value of a memory location or range of locations (via slice)"""
         if type(addr_or_slice) is int:
-            if self.hooked_reads[addr_or_slice]:
-                value = self.mem[addr_or_slice]
-                for hook in self.read_hooks[addr_or_slice]:
-                    newvalue = hook(addr_or_slice, value)
-                    if newvalue is not None:
-                        value = newvalue
-                self.mem[addr_or_slice] = value
-            return self.mem[addr_or_slice]
+            mem = self.mem
+            if not self.hooked_reads[addr_or_slice]:
+                return mem[addr_or_slice]     # the common case, no hooks
+            value = mem[addr_or_slice]
+            for hook in self.read_hooks[addr_or_slice]:
+                newvalue = hook(addr_or_slice, value)
+                if newvalue is not None:
+                    value = newvalue
+            mem[addr_or_slice] = value
+            return value
         elif type(addr_or_slice) is slice:
-            if any(self.hooked_reads[addr_or_slice]):
+            start, stop, step = addr_or_slice.indices(self.size)
+            if self._slice_has_hooks(self.hooked_reads, addr_or_slice, start, stop, step):
                 # there's at least one address in the slice with a hook, so... slow mode
-                return [self[addr] for addr in range(*addr_or_slice.indices(self.size))]
+                return [self[addr] for addr in range(start, stop, step)]
             else:
                 # there's no address in the slice that's hooked so we can return it fast
                 return self.mem[addr_or_slice]
@@ -114,6 +137,9 @@ class Memory:
     def __setitem__(self, addr_or_slice, value):
         """set the value of a memory location or range of locations (via slice)"""
         if type(addr_or_slice) is int:
+            if not self.hooked_writes[addr_or_slice] and not self.rom_areas:
+                self.mem[addr_or_slice] = value     # the common case, no hooks and no ROM
+                return
             if self.hooked_writes[addr_or_slice]:
                 for hook in self.write_hooks[addr_or_slice]:
                     newvalue = hook(addr_or_slice, self.mem[addr_or_slice], value)
@@ -124,51 +150,56 @@ class Memory:
             else:
                 self.mem[addr_or_slice] = value
         elif type(addr_or_slice) is slice:
-            if any(self.hooked_writes[addr_or_slice]):
+            # the slice indices are resolved once, and used for the hook check, the length and the loops
+            start, stop, step = addr_or_slice.indices(self.size)
+            if self._slice_has_hooks(self.hooked_writes, addr_or_slice, start, stop, step):
                 # there's at least one address in the slice with a hook, so... slow mode
+                slice_range = range(start, stop, step)
                 if type(value) is int:
-                    for addr in range(*addr_or_slice.indices(self.size)):
+                    for addr in slice_range:
                         self[addr] = value
                 else:
-                    slice_range = range(*addr_or_slice.indices(self.size))
                     if len(slice_range) != len(value):
                         raise ValueError("value length differs from memory slice length")
                     for addr, value in zip(slice_range, value):
                         self[addr] = value
             else:
                 # there's no address in the slice that's hooked so we can write fast
-                slice_len = len(range(*addr_or_slice.indices(self.size)))
+                slice_len = max(0, stop - start) if step == 1 else len(range(start, stop, step))
                 if type(value) is int:
                     value = bytes([value]) * slice_len
                 elif len(value) != slice_len:
                     raise ValueError("value length differs from memory slice length")
+                if not slice_len:
+                    return   # nothing to write (and an empty extended slice can't be assigned while _mv exists)
                 if self.rom_areas:
-                    self._write_with_romcheck_slice(addr_or_slice, value)
+                    self._write_with_romcheck_slice(addr_or_slice, value, start, stop, step)
                 else:
                     self.mem[addr_or_slice] = value
         else:
             raise TypeError("invalid address type")
 
+    def _slice_has_hooks(self, hooked, addrslice, start, stop, step):
+        # a contiguous range is searched for a marked address with bytearray.find, at C speed
+        if step == 1:
+            return hooked.find(1, start, stop) >= 0
+        return any(hooked[addrslice])
+
     def _write_with_romcheck_addr(self, address, value):
         for rom_start, rom_end in self.rom_areas:
             if address >= rom_start and address <= rom_end:
                 return   # don't write to ROM address
         self.mem[address] = value
 
-    def _write_with_romcheck_slice(self, addrslice, value):
+    def _write_with_romcheck_slice(self, addrslice, value, start, stop, step):
+        # value is already a sequence of the slice's length, and start, stop, step are the resolved slice indices
+        first, last = (start, stop - 1) if step > 0 else (stop + 1, start)
         for rom_start, rom_end in self.rom_areas:
-            if addrslice.start <= rom_end and addrslice.stop >= rom_start+1:
+            if first <= rom_end and last >= rom_start:
                 # the slice could be *partially* in RAM and *partially* in ROM
                 # we're not figuring that out here, just write/check every byte individually.
-                if type(value) is int:
-                    for addr in range(*addrslice.indices(self.size)):
-                        self[addr] = value
-                else:
-                    slice_range = range(*addrslice.indices(self.size))
-                    if len(slice_range) != len(value):
-                        raise ValueError("value length differs from memory slice length")
-                    for addr, value in zip(slice_range, value):
-                        self[addr] = value
+                for addr, value in zip(range(start, stop, step), value):
+                    self[addr] = value
                 return
         # whole slice is outside of all rom areas, just write it
         self.mem[addrslice] = value
@@ -178,7 +209,7 @@ class Memory:
         Register a hook function to be called when a write occurs to the given memory address.
         The function(addr, oldval, newval) can return a modified value to be written.
         """
-        self.write_hooks[address].append(hook)
+        self.write_hooks.setdefault(address, []).append(hook)
         self.hooked_writes[address] = 1
 
     def intercept_read(self, address, hook):
@@ -186,7 +217,7 @@ class Memory:
         Register a hook function to be called when a read occurs of the given memory address.
         The function(addr, value) can return a modified value to be the result of the read.
         """
-        self.read_hooks[address].append(hook)
+        self.read_hooks.setdefault(address, []).append(hook)
         self.hooked_reads[address] = 1
 
     def load_rom(self, romfile, address):
@@ -256,12 +287,69 @@ class ScreenAndMemory:
         0xADADAD,   # 15 = light grey
     )
 
+    # decoding table from screen codes to ASCII (via the cbmcodec), reverse-video is discarded
+    _screen2ascii_table = str(bytes(code & 0x7f for code in range(256)), "screencode-c64-lc")
+    # translation table from screen codes to petscii codes (reverse-video is discarded)
+    _screen2petscii_table = bytes(sc + 64 if sc <= 0x1f else sc if sc <= 0x3f else sc + 32
+                                  for sc in (code & 0x7f for code in range(256)))
+
+    # translation tables from petscii codes to screen codes, normal and reverse-video
+    _petscii2screen_table = bytes(pc + 128 if pc <= 0x1f else pc if pc <= 0x3f else pc - 64 if pc <= 0x5f else
+                                  pc - 32 if pc <= 0x7f else pc + 64 if pc <= 0x9f else pc - 64 if pc <= 0xbf else
+                                  pc - 128 if pc <= 0xfe else 94 for pc in range(256))
+    _petscii2screen_reversed_table = bytes(code | 0x80 for code in _petscii2screen_table)
+    # write() turns shift-RETURN into RETURN and deletes the non-printable codes with a single translate
+    _write_return_table = bytes(0x0d if code == 0x8d else code for code in range(256))
+    _write_non_printable = bytes([0, 1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12, 15, 16,
+                                  21, 22, 23, 24, 25, 26, 27, 128, 130, 131, 132,
+                                  133, 134, 135, 136, 137, 138, 139, 140, 143])
+    # the petscii codes that change the text color, and what write() does for the other control codes
+    _write_text_colors = {
+        0x05: 1,  # white
+        0x1c: 2,  # red
+        0x1e: 5,  # green
+        0x1f: 6,  # blue
+        0x81: 8,  # orange
+        0x90: 0,  # black
+        0x95: 9,  # brown
+        0x96: 10,  # pink/light red
+        0x97: 11,  # dark grey
+        0x98: 12,  # grey
+        0x99: 13,  # light green
+        0x9a: 14,  # light blue
+        0x9b: 15,  # light grey
+        0x9c: 4,  # purple
+        0x9e: 7,  # yellow
+        0x9f: 3,  # cyan
+    }
+    _write_controls = {
+        0x0d: lambda self: self._write_return(),
+        0x0e: lambda self: setattr(self, "_shifted", True),
+        0x8e: lambda self: setattr(self, "_shifted", False),
+        0x11: lambda self: self.down(),
+        0x91: lambda self: self.up(),
+        0x1d: lambda self: self.right(),
+        0x9d: lambda self: self.left(),
+        0x12: lambda self: setattr(self, "inversevid", True),
+        0x92: lambda self: setattr(self, "inversevid", False),
+        0x13: lambda self: self.cursormove(0, 0),   # home
+        0x14: lambda self: self.backspace(),
+        0x94: lambda self: self.insert(),
+        0x93: lambda self: self.clear(),
+    }
+    # the petscii control codes that write() handles, it splits the text into printable runs on these
+    _write_special_codes = re.compile(b"([" + re.escape(bytes(sorted([*_write_text_colors, *_write_controls]))) + b"])")
+
+    # the 00/FF pattern that a hard reset puts in $0800-$ffff
+    _reset_pattern = (bytes(64) + b"\xff" * 64) * ((0x10000 - 0x0800) // 128)
+
     def __init__(self, columns=40, rows=25, sprites=8, rom_directory="", run_real_roms=False):
         # zeropage is from $0000-$00ff
         # screen chars     $0400-$07ff
         # screen colors    $d800-$dbff
         self.run_real_roms = run_real_roms
         self.memory = Memory(65536)    # 64 Kb
+        self._mv = self.memory._mv   # direct access to the memory bytes for bulk screen moves (no hooks)
         self.using_roms = False
         if rom_directory:
             for rom, address in (("basic", 0xa000), ("kernal", 0xe000)):
@@ -282,6 +370,19 @@ class ScreenAndMemory:
         self.columns = columns
         self.rows = rows
         self.sprites = sprites
+        # the screen dimensions never change, so these derived values are computed only once
+        self._screensize = columns * rows
+        self._last_line_start = columns * (rows - 1)
+        # zero-copy views on the screen chars and colors, indexed by screen position
+        self.screen_chars = self._mv[0x0400: 0x0400 + self._screensize]
+        self.screen_colors = self._mv[0xd800: 0xd800 + self._screensize]
+        self._fullscreen_scroll_area = (columns, rows, 0x0400, 0xd800)   # width, height, chars start, colors start
+        # snapshots of the screen as it was at the previous getdirty() call, updated in place
+        self._previous_checked_chars = bytearray(self._screensize)
+        self._previous_checked_colors = bytearray(self._screensize)
+        # screen-sized runs of each fill char and color value used so far, sliced instead of built on every write, scroll or clear
+        self._char_fills = {}
+        self._color_fills = {}
         self.reset(True)
         self.install_memory_hooks(run_real_roms)
 
@@ -293,21 +394,22 @@ class ScreenAndMemory:
             self._full_repaint |= bool((oldval & 2) ^ (newval & 2))
 
         def read_jiffieclock(address, value):
-            jiffies = int(self.hz * (time.perf_counter() - self.jiffieclock_epoch)) % (24 * 3600 * self.hz)
-            if address == 160:
-                return (jiffies >> 16) & 0xff
-            if address == 161:
-                return (jiffies >> 8) & 0xff
-            return jiffies & 0xff
+            # the three clock bytes are usually read right after each other, reuse the jiffies for that burst
+            now = time.perf_counter()
+            if now - self._jiffies_cache[0] < 0.001:
+                jiffies = self._jiffies_cache[1]
+            else:
+                jiffies = int(self.hz * (now - self.jiffieclock_epoch)) % (24 * 3600 * self.hz)
+                self._jiffies_cache = (now, jiffies)
+            # 160 is the high byte, 162 the low byte
+            shift = (162 - address) * 8
+            return (jiffies >> shift) & 0xff
 
         def write_jiffieclock(address, oldval, newval):
-            jiffies = int(self.hz * (time.perf_counter() - self.jiffieclock_epoch)) & 0xffffff
-            if address == 160:
-                jiffies = (jiffies & 0x00ffff) | (newval << 16)
-            elif address == 161:
-                jiffies = (jiffies & 0xff00ff) | (newval << 8)
-            else:
-                jiffies = (jiffies & 0xffff00) | newval
+            now = time.perf_counter()
+            jiffies = int(self.hz * (now - self.jiffieclock_epoch)) & 0xffffff
+            shift = (162 - address) * 8
+            jiffies = (jiffies & (0xffffff ^ 0xff << shift)) | (newval << shift)
             if jiffies > self.hz * 24 * 3600:
                 jiffies = 0
                 newval = 0
@@ -317,8 +419,8 @@ class ScreenAndMemory:
                     self.memory[160], self.memory[162] = 0, 0
                 else:
                     self.memory[160], self.memory[161] = 0, 0
-                self.jiffieclock_epoch = time.perf_counter()
-            self.jiffieclock_epoch = time.perf_counter() - jiffies / self.hz
+            self.jiffieclock_epoch = now - jiffies / self.hz
+            self._jiffies_cache = (-1.0, 0)
             return newval
 
         def write_controlregister(address, oldval, newval):
@@ -359,8 +461,6 @@ class ScreenAndMemory:
         self.cursor_state = False
         self.cursor_blink_rate = 300
         self._cursor_enabled = True
-        self._previous_checked_chars = bytearray(self.columns * self.rows)
-        self._previous_checked_colors = bytearray(self.columns * self.rows)
         if hard:
             self.memory.clear()
         # initialize the zero page and stack with a dump of the values of these pages from a running c64 memory dump
@@ -397,12 +497,16 @@ class ScreenAndMemory:
                                           0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff,
                                           0xff, 0xff, 0xff, 0xff, 0x3f, 0x7d, 0xea, 0x7d, 0xea, 0x20, 0x07, 0xff, 0x7d, 0xea, 0x85, 0x01,
                                           0x00, 0x22, 0xd4, 0xe5, 0x00, 0x0a, 0x14, 0xe1, 0x64, 0xa5, 0x85, 0xa4, 0x79, 0xa6, 0x9c, 0xe3]
-            self.memory[0x0200:0x0300] = bytearray(256)   # clear the third page
+            self.memory[0x0200:0x0300] = 0   # clear the third page
             if hard:
-                # from $0800-$ffff we have a 00/FF pattern alternating every 64 bytes
-                for m in range(0x0840, 0x10000, 128):
-                    self.memory[m: m + 64] = b"\xff" * 64
-            self.memory[0xd000:0xd031] = bytearray(0x31)   # wipe VIC registers
+                # from $0800-$ffff we have a 00/FF pattern alternating every 64 bytes.
+                # the memory was just cleared so the whole pattern is copied at once into every RAM range (skipping ROM)
+                start = 0x0800
+                for rom_start, rom_end in sorted(self.memory.rom_areas) + [(0x10000, 0x10000)]:
+                    if rom_start > start:
+                        self.memory.mem[start:rom_start] = self._reset_pattern[start - 0x0800: rom_start - 0x0800]
+                    start = max(start, rom_end + 1)
+            self.memory[0xd000:0xd031] = 0   # wipe VIC registers
             self.memory[0xd027:0xd02f] = [1, 2, 3, 4, 5, 6, 7, 12]    # initial sprite colors
             self.memory[0x07f8:0x0800] = [255, 255, 255, 255, 255, 255, 255, 255]   # sprite pointers
             self.memory[0xd018] = 21
@@ -420,6 +524,7 @@ class ScreenAndMemory:
             if (0xe000, 0xffff) not in self.memory.rom_areas:
                 self.memory[0xe000:0x10000] = 96   # kernal ROM are all RTS instructions (in case no ROM file is present)
         self.jiffieclock_epoch = time.perf_counter()
+        self._jiffies_cache = (-1.0, 0)   # (time, jiffies) of the last jiffie clock read
         self.border = 14
         self.screen = 6
         self.text = 14
@@ -431,7 +536,7 @@ class ScreenAndMemory:
 
     @property
     def screen(self):
-        return self.memory[53281]
+        return self.memory.mem[53281]
 
     @screen.setter
     def screen(self, color):
@@ -440,7 +545,7 @@ class ScreenAndMemory:
 
     @property
     def border(self):
-        return self.memory[53280]
+        return self.memory.mem[53280]
 
     @border.setter
     def border(self, color):
@@ -448,11 +553,11 @@ class ScreenAndMemory:
 
     @property
     def text(self):
-        return self.memory[646]
+        return self.memory.mem[646]     # no hooks on the text color, access it directly
 
     @text.setter
     def text(self, color):
-        self.memory[646] = color
+        self.memory.mem[646] = color
 
     @property
     def csel38(self):
@@ -472,7 +577,7 @@ class ScreenAndMemory:
 
     @property
     def shifted(self):
-        return bool(self.memory[53272] & 2)
+        return bool(self.memory.mem[53272] & 2)
 
     @shifted.setter
     def shifted(self, value):
@@ -483,7 +588,7 @@ class ScreenAndMemory:
 
     @property
     def scrollx(self):
-        return self.memory[53270] & 7
+        return self.memory.mem[53270] & 7
 
     @scrollx.setter
     def scrollx(self, value):
@@ -523,13 +628,16 @@ class ScreenAndMemory:
 
     def getsprites(self, which=None, bitmap=True):
         # return all data of one or more sprites (in a dict)
-        colors = self.memory[0xd027:0xd02f]
-        pos = self.memory[0xd000:0xd010]
-        xmsb = self.memory[0xd010]
-        doublex = self.memory[0xd01d]
-        doubley = self.memory[0xd017]
-        enabled = self.memory[0xd015]
-        pointers = self.memory[0x07f8:0x0800]
+        # the sprite registers have no hooks, read them all in one go
+        mem = self.memory.mem
+        vic = mem[0xd000:0xd030]
+        colors = vic[0x27:0x2f]
+        pos = vic[0x00:0x10]
+        xmsb = vic[0x10]
+        doublex = vic[0x1d]
+        doubley = vic[0x17]
+        enabled = vic[0x15]
+        pointers = mem[0x07f8:0x0800]
         if which is None:
             which = range(self.sprites)
         else:
@@ -537,12 +645,13 @@ class ScreenAndMemory:
         result = {}
         for i in which:
             s = ScreenAndMemory.Sprite()
+            bit = 1 << i    # this sprite's bit in the flag registers
             s.color = colors[i]
-            s.x = pos[i * 2] + (256 if xmsb & 1 << i else 0)
+            s.x = pos[i * 2] + (256 if xmsb & bit else 0)
             s.y = pos[1 + i * 2]
-            s.doublex = bool(doublex & 1 << i)
-            s.doubley = bool(doubley & 1 << i)
-            s.enabled = bool(enabled & 1 << i)
+            s.doublex = bool(doublex & bit)
+            s.doubley = bool(doubley & bit)
+            s.enabled = bool(enabled & bit)
             s.pointer = pointers[i] * 64
             if bitmap:
                 s.bitmap = self.memory[s.pointer: s.pointer + 63]
@@ -571,13 +680,14 @@ class ScreenAndMemory:
 
     def blink_cursor(self):
         if self.cursor_enabled:
+            chars, colors = self.screen_chars, self.screen_colors
             self.cursor_state = not self.cursor_state
             if self.cursor_state:
-                self.memory[0x0287] = self.memory[0xd800 + self.cursor]   # save char color to GDCOL memory address
-                self.memory[0xd800 + self.cursor] = self.text
+                self.memory[0x0287] = colors[self.cursor]   # save char color to GDCOL memory address
+                colors[self.cursor] = self.text
             else:
-                self.memory[0xd800 + self.cursor] = self.memory[0x0287]   # restore char color from GDCOL address
-            self.memory[0x0400 + self.cursor] ^= 0x80
+                colors[self.cursor] = self.memory[0x0287]   # restore char color from GDCOL address
+            chars[self.cursor] ^= 0x80
 
     def writestr(self, txt):
         """Write ASCII text to the screen."""
@@ -593,129 +703,96 @@ class ScreenAndMemory:
 
     @classmethod
     def _petscii2screen(cls, petscii_code, inversevid=False):
-        if petscii_code <= 0x1f:
-            code = petscii_code + 128
-        elif petscii_code <= 0x3f:
-            code = petscii_code
-        elif petscii_code <= 0x5f:
-            code = petscii_code - 64
-        elif petscii_code <= 0x7f:
-            code = petscii_code - 32
-        elif petscii_code <= 0x9f:
-            code = petscii_code + 64
-        elif petscii_code <= 0xbf:
-            code = petscii_code - 64
-        elif petscii_code <= 0xfe:
-            code = petscii_code - 128
-        else:
-            code = 94
         if inversevid:
-            return code | 0x80
-        return code
+            return cls._petscii2screen_reversed_table[petscii_code]
+        return cls._petscii2screen_table[petscii_code]
 
     def write(self, petscii):
         """Write PETSCII-encoded text to the screen."""
         assert isinstance(petscii, bytes)
         self._fix_cursor()
-        petscii = petscii.replace(b"\x8d", b"\x0d")    # replace shift-RETURN by regular RETURN
-        txtcolors = {
-            0x05: 1,  # white
-            0x1c: 2,  # red
-            0x1e: 5,  # green
-            0x1f: 6,  # blue
-            0x81: 8,  # orange
-            0x90: 0,  # black
-            0x95: 9,  # brown
-            0x96: 10,  # pink/light red
-            0x97: 11,  # dark grey
-            0x98: 12,  # grey
-            0x99: 13,  # light green
-            0x9a: 14,  # light blue
-            0x9b: 15,  # light grey
-            0x9c: 4,  # purple
-            0x9e: 7,  # yellow
-            0x9f: 3,  # cyan
-        }
-        non_printable = {0, 1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12, 15, 16,
-                         21, 22, 23, 24, 25, 26, 27, 128, 130, 131, 132,
-                         133, 134, 135, 136, 137, 138, 139, 140, 143}
-
-        def handle_special(c):
-            # note: return/shift-return are handled automatically
-            if c in txtcolors:
-                self.text = txtcolors[c]
-            elif c == 0x0d:
-                # RETURN, go to next line
-                self.cursor = self.columns * (1 + self.cursor // self.columns)
-                if self.cursor > self.columns * (self.rows - 1):
-                    self._scroll_up()
-                    self.cursor = self.columns * (self.rows - 1)
-                # also, disable inverse-video
-                self.inversevid = False
-            elif c == 0x0e:
-                self._shifted = True
-            elif c == 0x8e:
-                self._shifted = False
-            elif c == 0x11:
-                self.down()
-            elif c == 0x91:
-                self.up()
-            elif c == 0x1d:
-                self.right()
-            elif c == 0x9d:
-                self.left()
-            elif c == 0x12:
-                self.inversevid = True
-            elif c == 0x92:
-                self.inversevid = False
-            elif c == 0x13:
-                self.cursormove(0, 0)   # home
-            elif c == 0x14:
-                self.backspace()
-            elif c == 0x94:
-                self.insert()
-            elif c == 0x93:
-                self.clear()
-            else:
-                return False
-            return True
-
+        # replace shift-RETURN by regular RETURN and drop the non-printable codes, in one pass
+        petscii = petscii.translate(self._write_return_table, self._write_non_printable)
         prev_cursor_enabled = self._cursor_enabled
         self._cursor_enabled = False
-        for c in petscii:
-            if c in non_printable:
+        screensize = self._screensize
+        chars, colors = self.screen_chars, self.screen_colors   # these have no hooks, so they're written directly
+        for index, run in enumerate(self._write_special_codes.split(petscii)):
+            if index % 2:
+                # the text was split on these control codes
+                code = run[0]
+                if code in self._write_text_colors:
+                    self.text = self._write_text_colors[code]
+                else:
+                    self._write_controls[code](self)
                 continue
-            if not handle_special(c):
-                self.memory[0x0400 + self.cursor] = self._petscii2screen(c, self.inversevid)
-                self.memory[0xd800 + self.cursor] = self.text
-                self.cursor += 1
-                if self.cursor >= self.columns * self.rows:
+            while run:
+                if self.cursor >= screensize:
+                    # the cursor is past the end of the screen, scroll first to make room
+                    self._scroll_up()
+                    self.cursor = self._last_line_start
+                # translate and write as much of the printable run as fits on the screen in one go
+                size = min(len(run), screensize - self.cursor)
+                table = self._petscii2screen_reversed_table if self.inversevid else self._petscii2screen_table
+                chars[self.cursor: self.cursor + size] = run[:size].translate(table)
+                colors[self.cursor: self.cursor + size] = self._color_fill(self.text)[:size]
+                self.cursor += size
+                run = run[size:]
+                if self.cursor >= screensize:
                     self._scroll_up()
-                    self.cursor = self.columns * (self.rows - 1)
+                    self.cursor = self._last_line_start
         self._cursor_enabled = prev_cursor_enabled
         self._fix_cursor(True)
 
+    def _write_return(self):
+        # RETURN in written text, go to next line
+        self.cursor = self.columns * (1 + self.cursor // self.columns)
+        if self.cursor > self._last_line_start:
+            self._scroll_up()
+            self.cursor = self._last_line_start
+        # also, disable inverse-video
+        self.inversevid = False
+
     def _fix_cursor(self, on=False):
-        if on and not self.cursor_enabled:
-            return
-        if not on and self.cursor_state:
-            self.memory[0x0400 + self.cursor] &= 0x7f
-            self.memory[0xd800 + self.cursor] = self.memory[0x0287]  # restore char color from GDCOL
-        if on and not self.cursor_state:
-            self.memory[0x0287] = self.memory[0xd800 + self.cursor]  # save char color to GDCOL address
-            self.memory[0x0400 + self.cursor] |= 0x80
-            self.memory[0xd800 + self.cursor] = self.text
+        if on == self.cursor_state or (on and not self.cursor_enabled):
+            return   # cursor is already in the requested state (or can't be shown), no memory writes needed
+        chars, colors = self.screen_chars, self.screen_colors
+        if on:
+            self.memory[0x0287] = colors[self.cursor]  # save char color to GDCOL address
+            chars[self.cursor] |= 0x80
+            colors[self.cursor] = self.text
+        else:
+            chars[self.cursor] &= 0x7f
+            colors[self.cursor] = self.memory[0x0287]  # restore char color from GDCOL
         self.cursor_state = on
 
+    def _char_fill(self, fillchar):
+        # built only the first time a fill char is used
+        fill = self._char_fills.get(fillchar)
+        if fill is None:
+            fill = self._char_fills[fillchar] = memoryview(bytes([fillchar]) * self._screensize)
+        return fill
+
+    def _color_fill(self, fillcolor):
+        # built only the first time a fill color is used
+        fill = self._color_fills.get(fillcolor)
+        if fill is None:
+            fill = self._color_fills[fillcolor] = memoryview(bytes([fillcolor]) * self._screensize)
+        return fill
+
     def _calc_scroll_params(self, topleft, bottomright, fill):
+        fillchar = fill[0]
+        fillcolor = self.text if fill[1] is None else fill[1]
+        if topleft is None and bottomright is None:
+            # scrolling the whole screen is the common case, its area is precalculated
+            width, height, chars_start, colors_start = self._fullscreen_scroll_area
+            return width, height, fillchar, fillcolor, chars_start, colors_start
         if topleft is None:
             topleft = (0, 0)
         if bottomright is None:
             bottomright = (self.columns - 1, self.rows - 1)
         width = bottomright[0] - topleft[0] + 1
         height = bottomright[1] - topleft[1] + 1
-        fillchar = fill[0]
-        fillcolor = self.text if fill[1] is None else fill[1]
         chars_start = 0x0400 + topleft[0] + topleft[1] * self.columns
         colors_start = chars_start + 0xd400
         return width, height, fillchar, fillcolor, chars_start, colors_start
@@ -723,70 +800,106 @@ class ScreenAndMemory:
     def _scroll_up(self, topleft=None, bottomright=None, fill=(32, None), amount=1):
         width, height, fillchar, fillcolor, chars_start, colors_start = self._calc_scroll_params(topleft, bottomright, fill)
         amount = min(amount, height)
-        if width == self.columns:
-            # Full width of screen; can be done with single slice assignments.
-            self.memory[chars_start: chars_start + self.columns * (height - amount)] =\
-                self.memory[chars_start + self.columns * amount: chars_start + self.columns * height]
-            self.memory[colors_start: colors_start + self.columns * (height - amount)] =\
-                self.memory[colors_start + self.columns * amount: colors_start + self.columns * height]
-            self.memory[chars_start + self.columns * (height - amount): chars_start + self.columns * height] = fillchar
-            self.memory[colors_start + self.columns * (height - amount): colors_start + self.columns * height] = fillcolor
+        mv = self._mv
+        columns = self.columns
+        shift = columns * amount
+        if width == columns:
+            # Full width of screen; can be done with single slice assignments (memmoves).
+            size = columns * height
+            mv[chars_start: chars_start + size - shift] = mv[chars_start + shift: chars_start + size]
+            mv[colors_start: colors_start + size - shift] = mv[colors_start + shift: colors_start + size]
+            charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+            mv[chars_start + size - shift: chars_start + size] = charfill[:shift]
+            mv[colors_start + size - shift: colors_start + size] = colorfill[:shift]
         else:
             # we must scroll a part of the screen, this must be done on a per-line basis.
-            for y in range(0, height - amount):
-                self.memory[chars_start + self.columns * y: chars_start + width + self.columns * y] =\
-                    self.memory[chars_start + self.columns * (y + amount): chars_start + width + self.columns * (y + amount)]
-                self.memory[colors_start + self.columns * y: colors_start + width + self.columns * y] =\
-                    self.memory[colors_start + self.columns * (y + amount): colors_start + width + self.columns * (y + amount)]
-            for y in range(height - amount, height):
-                self.memory[chars_start + self.columns * y: chars_start + width + self.columns * y] = fillchar
-                self.memory[colors_start + self.columns * y: colors_start + width + self.columns * y] = fillcolor
+            for line in range(0, columns * (height - amount), columns):
+                src = line + shift
+                mv[chars_start + line: chars_start + width + line] = mv[chars_start + src: chars_start + width + src]
+                mv[colors_start + line: colors_start + width + line] = mv[colors_start + src: colors_start + width + src]
+            charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+            charfill, colorfill = charfill[:width], colorfill[:width]
+            for line in range(columns * (height - amount), columns * height, columns):
+                mv[chars_start + line: chars_start + width + line] = charfill
+                mv[colors_start + line: colors_start + width + line] = colorfill
 
     def _scroll_down(self, topleft=None, bottomright=None, fill=(32, None), amount=1):
         width, height, fillchar, fillcolor, chars_start, colors_start = self._calc_scroll_params(topleft, bottomright, fill)
         amount = min(amount, height)
-        if width == self.columns:
-            # Full width of screen; can be done with single slice assignments.
-            self.memory[chars_start + self.columns * amount: chars_start + self.columns * height] =\
-                self.memory[chars_start: chars_start + self.columns * (height - amount)]
-            self.memory[colors_start + self.columns * amount: colors_start + self.columns * height] =\
-                self.memory[colors_start: colors_start + self.columns * (height - amount)]
-            self.memory[chars_start: chars_start + self.columns * amount] = fillchar
-            self.memory[colors_start: colors_start + self.columns * amount] = fillcolor
+        mv = self._mv
+        columns = self.columns
+        shift = columns * amount
+        if width == columns:
+            # Full width of screen; can be done with single slice assignments (memmoves).
+            size = columns * height
+            mv[chars_start + shift: chars_start + size] = mv[chars_start: chars_start + size - shift]
+            mv[colors_start + shift: colors_start + size] = mv[colors_start: colors_start + size - shift]
+            charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+            mv[chars_start: chars_start + shift] = charfill[:shift]
+            mv[colors_start: colors_start + shift] = colorfill[:shift]
         else:
             # we must scroll a part of the screen, this must be done on a per-line basis.
-            for y in range(height - 1, amount - 1, -1):
-                self.memory[chars_start + self.columns * y: chars_start + width + self.columns * y] =\
-                    self.memory[chars_start + self.columns * (y - amount): chars_start + width + self.columns * (y - amount)]
-                self.memory[colors_start + self.columns * y: colors_start + width + self.columns * y] =\
-                    self.memory[colors_start + self.columns * (y - amount): colors_start + width + self.columns * (y - amount)]
-            for y in range(0, amount):
-                self.memory[chars_start + self.columns * y: chars_start + width + self.columns * y] = fillchar
-                self.memory[colors_start + self.columns * y: colors_start + width + self.columns * y] = fillcolor
+            for line in range(columns * (height - 1), shift - 1, -columns):
+                src = line - shift
+                mv[chars_start + line: chars_start + width + line] = mv[chars_start + src: chars_start + width + src]
+                mv[colors_start + line: colors_start + width + line] = mv[colors_start + src: colors_start + width + src]
+            charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+            charfill, colorfill = charfill[:width], colorfill[:width]
+            for line in range(0, shift, columns):
+                mv[chars_start + line: chars_start + width + line] = charfill
+                mv[colors_start + line: colors_start + width + line] = colorfill
 
     def _scroll_left(self, topleft=None, bottomright=None, fill=(32, None), amount=1):
         width, height, fillchar, fillcolor, chars_start, colors_start = self._calc_scroll_params(topleft, bottomright, fill)
         amount = min(amount, width)
-        for y in range(0, height):
-            self.memory[chars_start + self.columns * y: chars_start + self.columns * y + width - amount] = \
-                self.memory[chars_start + self.columns * y + amount: chars_start + self.columns * y + width]
-            self.memory[colors_start + self.columns * y: colors_start + self.columns * y + width - amount] = \
-                self.memory[colors_start + self.columns * y + amount: colors_start + self.columns * y + width]
-        for x in range(width - amount, width):
-            self.memory[chars_start + x: chars_start + x + self.columns * height: self.columns] = fillchar
-            self.memory[colors_start + x: colors_start + x + self.columns * height: self.columns] = fillcolor
+        mv = self._mv
+        columns = self.columns
+        charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+        if width == columns:
+            # Full width of screen; shift the whole area in one go, this moves the first chars of every line
+            # to the end of the previous line, but those are overwritten by the fill columns right after.
+            size = columns * height
+            mv[chars_start: chars_start + size - amount] = mv[chars_start + amount: chars_start + size]
+            mv[colors_start: colors_start + size - amount] = mv[colors_start + amount: colors_start + size]
+            for column in range(columns - amount, columns):
+                mv[chars_start + column: chars_start + size: columns] = charfill[:height]
+                mv[colors_start + column: colors_start + size: columns] = colorfill[:height]
+        else:
+            # partial width: every line is shifted in place, and filled at its right end
+            charfill, colorfill = charfill[:amount], colorfill[:amount]
+            for line in range(0, columns * height, columns):
+                chars = chars_start + line
+                colors = colors_start + line
+                mv[chars: chars + width - amount] = mv[chars + amount: chars + width]
+                mv[chars + width - amount: chars + width] = charfill
+                mv[colors: colors + width - amount] = mv[colors + amount: colors + width]
+                mv[colors + width - amount: colors + width] = colorfill
 
     def _scroll_right(self, topleft=None, bottomright=None, fill=(32, None), amount=1):
         width, height, fillchar, fillcolor, chars_start, colors_start = self._calc_scroll_params(topleft, bottomright, fill)
         amount = min(amount, width)
-        for y in range(0, height):
-            self.memory[chars_start + amount + self.columns * y: chars_start + self.columns * y + width] = \
-                self.memory[chars_start + self.columns * y: chars_start + self.columns * y + width - amount]
-            self.memory[colors_start + amount + self.columns * y: colors_start + self.columns * y + width] = \
-                self.memory[colors_start + self.columns * y: colors_start + self.columns * y + width - amount]
-        for x in range(amount):
-            self.memory[chars_start + x: chars_start + x + self.columns * height: self.columns] = fillchar
-            self.memory[colors_start + x: colors_start + x + self.columns * height: self.columns] = fillcolor
+        mv = self._mv
+        columns = self.columns
+        charfill, colorfill = self._char_fill(fillchar), self._color_fill(fillcolor)
+        if width == columns:
+            # Full width of screen; shift the whole area in one go, this moves the last chars of every line
+            # to the start of the next line, but those are overwritten by the fill columns right after.
+            size = columns * height
+            mv[chars_start + amount: chars_start + size] = mv[chars_start: chars_start + size - amount]
+            mv[colors_start + amount: colors_start + size] = mv[colors_start: colors_start + size - amount]
+            for column in range(amount):
+                mv[chars_start + column: chars_start + size: columns] = charfill[:height]
+                mv[colors_start + column: colors_start + size: columns] = colorfill[:height]
+        else:
+            # partial width: every line is shifted in place, and filled at its left end
+            charfill, colorfill = charfill[:amount], colorfill[:amount]
+            for line in range(0, columns * height, columns):
+                chars = chars_start + line
+                colors = colors_start + line
+                mv[chars + amount: chars + width] = mv[chars: chars + width - amount]
+                mv[chars: chars + amount] = charfill
+                mv[colors + amount: colors + width] = mv[colors: colors + width - amount]
+                mv[colors: colors + amount] = colorfill
 
     def scroll(self, topleft, bottomright, up=False, down=False, left=False, right=False, fill=(32, None), amount=1):
         self._fix_cursor()
@@ -803,7 +916,7 @@ class ScreenAndMemory:
     def return_key(self):
         self._fix_cursor()
         self.cursor = self.columns * (self.cursor // self.columns) + self.columns
-        if self.cursor >= self.columns * self.rows:
+        if self.cursor >= self._screensize:
             self._scroll_up()
             self.cursor -= self.columns
         self._fix_cursor(on=True)
@@ -812,21 +925,25 @@ class ScreenAndMemory:
         if self.cursor > 0:
             self._fix_cursor()
             self.cursor -= 1
-            end = self.columns * (self.cursor // self.columns) + self.columns - 1
-            self.memory[0x0400 + self.cursor: 0x0400 + end] = self.memory[0x0400 + self.cursor + 1: 0x0400 + end + 1]
-            self.memory[0xd800 + self.cursor: 0xd800 + end] = self.memory[0xd800 + self.cursor + 1: 0xd800 + end + 1]
-            self.memory[0x0400 + end] = 32
-            self.memory[0xd800 + end] = self.text
+            # shift the rest of the line one position left (in place) and put a space at its end
+            chars, colors, cursor = self.screen_chars, self.screen_colors, self.cursor
+            end = self.columns * (cursor // self.columns) + self.columns - 1
+            chars[cursor: end] = chars[cursor + 1: end + 1]
+            colors[cursor: end] = colors[cursor + 1: end + 1]
+            chars[end] = 32
+            colors[end] = self.text
             self._fix_cursor(on=True)
 
     def insert(self):
-        if self.cursor < self.columns * self.rows - 1:
+        if self.cursor < self._screensize - 1:
             self._fix_cursor()
-            end = self.columns * (self.cursor // self.columns) + self.columns
-            self.memory[0x0400 + self.cursor + 1: 0x0400 + end] = self.memory[0x0400 + self.cursor: 0x0400 + end - 1]
-            self.memory[0xd800 + self.cursor + 1: 0xd800 + end] = self.memory[0xd800 + self.cursor: 0xd800 + end - 1]
-            self.memory[0x0400 + self.cursor] = 32
-            self.memory[0xd800 + self.cursor] = self.text
+            # shift the rest of the line one position right (in place) and put a space at the cursor
+            chars, colors, cursor = self.screen_chars, self.screen_colors, self.cursor
+            end = self.columns * (cursor // self.columns) + self.columns
+            chars[cursor + 1: end] = chars[cursor: end - 1]
+            colors[cursor + 1: end] = colors[cursor: end - 1]
+            chars[cursor] = 32
+            colors[cursor] = self.text
             self._fix_cursor(on=True)
 
     def up(self):
@@ -839,34 +956,46 @@ class ScreenAndMemory:
 
     def down(self):
         self._fix_cursor()
-        if self.cursor >= self.columns * (self.rows - 1):
+        if self.cursor >= self._last_line_start:
             self._scroll_up()
         else:
             self.cursor += self.columns
         self._fix_cursor(on=True)
 
     def left(self):
-        if self.cursor > 0:
+        self.move(-1, 0)
+
+    def right(self):
+        if self.cursor >= self._screensize - 1:
+            # like on the C64, moving right from the last cell scrolls the screen and goes to the start of the last line
             self._fix_cursor()
-            self.cursor -= 1
+            self._scroll_up()
+            self.cursor = self._last_line_start
             self._fix_cursor(on=True)
+        else:
+            self.move(1, 0)
 
-    def right(self):
-        if self.cursor < self.columns * self.rows:
+    def move(self, dx, dy):
+        """move the cursor dx columns and dy rows in one go, clamped to the screen (doesn't scroll)"""
+        cursor = min(max(self.cursor + dx + dy * self.columns, 0), self._screensize - 1)
+        if cursor != self.cursor:
             self._fix_cursor()
-            self.cursor += 1
+            self.cursor = cursor
             self._fix_cursor(on=True)
 
     def clear(self):
         # clear the screen buffer
-        self.memory[0x0400: 0x0400 + self.columns * self.rows] = 32
-        self.memory[0xd800: 0xd800 + self.columns * self.rows] = self.text
+        charfill, colorfill = self._char_fill(32), self._color_fill(self.text)
+        size = self._screensize
+        self._mv[0x0400: 0x0400 + size] = charfill
+        self._mv[0xd800: 0xd800 + size] = colorfill
         self.cursor = 0
         self._fix_cursor(on=True)
 
     def cursormove(self, x, y):
         self._fix_cursor()
-        self.cursor = x + self.columns * y
+        # keep the cursor on the screen, its cell is accessed through the screen-sized views
+        self.cursor = min(max(x + self.columns * y, 0), self._screensize - 1)
         self._fix_cursor(on=True)
 
     def cursorpos(self):
@@ -879,25 +1008,14 @@ class ScreenAndMemory:
             start_y = max(0, start_y - 1)
         if include_next:
             end_y = min(self.rows, end_y + 1)
-        self._fix_cursor()
-        screencodes = self.memory[0x0400 + self.columns * start_y: 0x0400 + self.columns * (end_y + 1)]
-        self._fix_cursor()
+        self._fix_cursor()    # hide the cursor so its reversed char isn't read back (one call is enough, it stays off)
+        screencodes = self.memory.mem[0x0400 + self.columns * start_y: 0x0400 + self.columns * (end_y + 1)]
         if format == "ascii":
-            # use the cbmcodec to translate screen codes back into ASCII
-            screencodes = bytes(sc & 0x7f for sc in screencodes)        # get rid of reverse-video
-            return str(screencodes, "screencode-c64-lc")
+            # decode the screen codes back into ASCII in a single pass using the precomputed table
+            return codecs.charmap_decode(screencodes, "strict", self._screen2ascii_table)[0]
         elif format == "petscii":
             # use a simple translation table to translate screen codes into petscii codes
-            screencodes = bytes(sc & 0x7f for sc in screencodes)        # get rid of reverse-video
-            result = []
-            for sc in screencodes:
-                if sc <= 0x1f:
-                    result.append(sc + 64)
-                elif sc <= 0x3f:
-                    result.append(sc)
-                else:
-                    result.append(sc + 32)
-            return bytes(result)
+            return bytes(screencodes).translate(self._screen2petscii_table)
         elif format == "screencodes":
             return screencodes
         else:
@@ -907,19 +1025,21 @@ class ScreenAndMemory:
         # this is pretty fast, on my machine about 0.001 second to diff a 64x50 screen (3200 chars)
         # it usually is worth this extra millisecond because it can give huge savings
         # in the actual screen redraw part
-        chars = self.memory[0x0400: 0x0400 + self.columns * self.rows]
-        colors = self.memory[0xd800: 0xd800 + self.columns * self.rows]
+        size = self._screensize
+        mem = self.memory.mem    # the screen chars and colors have no hooks, read them directly
+        chars = mem[0x0400: 0x0400 + size]
+        colors = mem[0xd800: 0xd800 + size]
         prev_chars = self._previous_checked_chars
         prev_colors = self._previous_checked_colors
 
+        # the result is three parallel sequences: the changed cell indexes, their chars, and their colors.
         if self._full_repaint:
             self._full_repaint = False
-            result = [(i, (chars[i], colors[i])) for i in range(self.columns * self.rows)]
+            result = range(size), bytes(chars), bytes(colors)
         else:
-            result = [(i, (chars[i], colors[i])) for i in range(self.columns * self.rows)
-                      if chars[i] != prev_chars[i] or colors[i] != prev_colors[i]]
-        self._previous_checked_chars = chars
-        self._previous_checked_colors = colors
+            result = _diff_pack(chars, colors, prev_chars, prev_colors)
+        prev_chars[:] = chars
+        prev_colors[:] = colors
         return result
 
     def setjoystick(self, left=False, right=False, up=False, down=False,
@@ -933,18 +1053,14 @@ class ScreenAndMemory:
         self.joy_rightup = rightup
         self.joy_leftdown = leftdown
         self.joy_rightdown = rightdown
-        clear_bits = 0   # 0=switch activated...
-        if self.joy_up | self.joy_leftup | self.joy_rightup:
-            clear_bits |= 1 << 0
-        if self.joy_down | self.joy_leftdown | self.joy_rightdown:
-            clear_bits |= 1 << 1
-        if self.joy_left | self.joy_leftup | self.joy_leftdown:
-            clear_bits |= 1 << 2
-        if self.joy_right | self.joy_rightup | self.joy_rightdown:
-            clear_bits |= 1 << 3
-        if self.joy_fire:
-            clear_bits |= 1 << 4
-        self.memory[56320] = (self.memory[56320] | 0b00011111) & ~clear_bits
+        # 0=switch activated...
+        clear_bits = bool(up | leftup | rightup) \
+            | bool(down | leftdown | rightdown) << 1 \
+            | bool(left | leftup | leftdown) << 2 \
+            | bool(right | rightup | rightdown) << 3 \
+            | bool(fire) << 4
+        port = self.memory[56320]
+        self.memory[56320] = (port | 0b00011111) & ~clear_bits
 
     def getjoystick(self):
         # returns left, right, up, down, fire statuses
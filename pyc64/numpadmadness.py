@@ -11,6 +11,16 @@ class NumpadmadnessWindow(tkinter.Tk):
         self.bind("<KeyPress>", self.keypress)
         self.bind("<KeyRelease>", self.keyrelease)
         self.bind("<KP_0>", self.keypadzero)
+        # pick the joystick key mapping for this platform once, instead of on every key event
+        if sys.platform == "darwin":
+            # OSX numkeys are problematic, I try to solve this via raw keycode
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_osx, "keycode"
+        elif sys.platform == "win32":
+            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_windows_keycode, "keycode"
+        else:
+            # sane platforms (Linux for one) play nice and just use the friendly keysym name.
+            self.joystick_keys, self.joystick_key_attr = self.joystick_keys_sane_platforms, "keysym"
 
     def keypadzero(self, event):
         print("KEYPADZERO", event)
@@ -69,38 +79,16 @@ class NumpadmadnessWindow(tkinter.Tk):
     def keyrelease(self, event):
         print(time.time(), "KEYRELEASE {char!r} keysym='{keysym}' keycode={keycode} "
                            "keysym_num={keysym_num} state={state}".format(**vars(event)))  # XXX
-        if sys.platform == "darwin":
-            # OSX numkeys are problematic, I try to solve this via raw keycode
-            if event.keycode in self.joystick_keys_osx:
-                print("JOYSTICK switch OFF:", self.joystick_keys_osx[event.keycode])
-                return
-        elif sys.platform == "win32":
-            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
-            if event.keycode in self.joystick_keys_windows_keycode:
-                print("JOYSTICK switch OFF:", self.joystick_keys_windows_keycode[event.keycode])
-                return
-        # sane platforms (Linux for one) play nice and just use the friendly keysym name.
-        elif event.keysym in self.joystick_keys_sane_platforms:
-            print("JOYSTICK switch OFF:", self.joystick_keys_sane_platforms[event.keysym])
-            return
+        switch = self.joystick_keys.get(getattr(event, self.joystick_key_attr))
+        if switch:
+            print("JOYSTICK switch OFF:", switch)
 
     def keypress(self, event):
         print(time.time(), "KEYPRESS {char!r} keysym='{keysym}' keycode={keycode} "
                            "keysym_num={keysym_num} state={state}".format(**vars(event)))  # XXX
-        if sys.platform == "darwin":
-            # OSX numkeys are problematic, I try to solve this via raw keycode
-            if event.keycode in self.joystick_keys_osx:
-                print("JOYSTICK switch ON:", self.joystick_keys_osx[event.keycode])
-                return
-        elif sys.platform == "win32":
-            # Windows numkeys are also problematic, need to solve this via keysym_num OR via keycode.. (sigh)
-            if event.keycode in self.joystick_keys_windows_keycode:
-                print("JOYSTICK switch ON:", self.joystick_keys_windows_keycode[event.keycode])
-                return
-        # sane platforms (Linux for one) play nice and just use the friendly keysym name.
-        elif event.keysym in self.joystick_keys_sane_platforms:
-            print("JOYSTICK switch ON:", self.joystick_keys_sane_platforms[event.keysym])
-            return
+        switch = self.joystick_keys.get(getattr(event, self.joystick_key_attr))
+        if switch:
+            print("JOYSTICK switch ON:", switch)
 
 
 w = NumpadmadnessWindow()
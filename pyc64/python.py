@@ -8,53 +8,70 @@ License: MIT open-source.
 import os
 import sys
 import traceback
+import functools
 from .shared import StdoutWrapper, do_load, do_dos, do_sys, FlowcontrolException
 
 
+@functools.lru_cache(maxsize=128)
+def _compile(source, filename, mode):
+    # the same program or REPL line is often run again, reuse its code object instead of compiling it each time
+    return compile(source, filename, mode)
+
+
 class ColorsProxy:
+    __slots__ = ("screen", "memory", "columns", "rows")
+
     def __init__(self, screen):
         self.screen = screen
+        # cached here because they're looked up on every subscript
+        self.memory = screen.memory
+        self.columns = screen.columns
+        self.rows = screen.rows
 
     def __getitem__(self, item):
         if type(item) is slice:
             item = slice(item.start + 0xd800, item.stop + 0xd800, item.step)
-            return self.screen.memory[item]
+            return self.memory[item]
         x, y = int(item[0]), int(item[1])
-        assert 0 <= x <= self.screen.columns and 0 <= y <= self.screen.rows, "position out of range"
-        _, color = self.screen.getchar(x, y)
-        return color
+        assert 0 <= x <= self.columns and 0 <= y <= self.rows, "position out of range"
+        return self.memory[0xd800 + x + self.columns * y]
 
     def __setitem__(self, item, value):
         if type(item) is slice:
             item = slice(item.start + 0xd800, item.stop + 0xd800, item.step)
-            self.screen.memory[item] = value
+            self.memory[item] = value
         else:
             x, y = int(item[0]), int(item[1])
-            assert 0 <= x <= self.screen.columns and 0 <= y <= self.screen.rows, "position out of range"
-            self.screen.memory[0xd800 + x + self.screen.columns * y] = value
+            assert 0 <= x <= self.columns and 0 <= y <= self.rows, "position out of range"
+            self.memory[0xd800 + x + self.columns * y] = value
 
 
 class CharsProxy:
+    __slots__ = ("screen", "memory", "columns", "rows")
+
     def __init__(self, screen):
         self.screen = screen
+        # cached here because they're looked up on every subscript
+        self.memory = screen.memory
+        self.columns = screen.columns
+        self.rows = screen.rows
 
     def __getitem__(self, item):
         if type(item) is slice:
             item = slice(item.start + 0x0400, item.stop + 0x0400, item.step)
-            return self.screen.memory[item]
+            return self.memory[item]
         x, y = int(item[0]), int(item[1])
-        assert 0 <= x <= self.screen.columns and 0 <= y <= self.screen.rows, "position out of range"
-        char, _ = self.screen.getchar(x, y)
-        return char
+        assert 0 <= x <= self.columns and 0 <= y <= self.rows, "position out of range"
+        return self.memory[0x0400 + x + self.columns * y]
 
     def __setitem__(self, item, value):
         if type(item) is slice:
             item = slice(item.start + 0x0400, item.stop + 0x0400, item.step)
-            self.screen.memory[item] = value
+            self.memory[item] = value
         else:
             x, y = int(item[0]), int(item[1])
-            assert 0 <= x <= self.screen.columns and 0 <= y <= self.screen.rows, "position out of range"
-            self.screen.memory[0x0400 + x + self.screen.columns * y] = value
+            assert 0 <= x <= self.columns and 0 <= y <= self.rows, "position out of range"
+            self.memory[0x0400 + x + self.columns * y] = value
 
 
 class PythonInterpreter:
@@ -96,7 +113,7 @@ class PythonInterpreter:
             "run": self.execute_run,
             "new": self.execute_new,
             "call": self.execute_sys,
-            "sync": lambda: self.check_run_stop(self.interactive.do_sync_command),
+            "sync": self.execute_sync,
             "sprite": self.execute_sprite
         }
         self.screen.writestr("\n  **** COMMODORE 64 PYTHON {:d}.{:d}.{:d} ****\n".format(*sys.version_info[:3]))
@@ -113,8 +130,10 @@ class PythonInterpreter:
     def execute_listprogram(self):
         self.screen.writestr("\n")
         self.must_run_stop = False
-        for line in self.program.splitlines(keepends=True):
-            self.screen.writestr(line)
+        lines = self.program.splitlines(keepends=True)
+        # write a few lines per screen sync instead of one, a long listing otherwise waits a refresh for every line
+        for start in range(0, len(lines), 8):
+            self.screen.writestr("".join(lines[start:start + 8]))
             if self.must_run_stop:
                 self.screen.writestr("break\n")
                 break
@@ -129,7 +148,7 @@ class PythonInterpreter:
             self.write_prompt()
             return
         try:
-            code = compile(line, "<input>", "single")
+            code = _compile(line, "<input>", "single")
             exec(code, self.symbols)
             self.write_prompt()
         except FlowcontrolException:
@@ -141,7 +160,7 @@ class PythonInterpreter:
 
     def program_step(self):
         try:
-            code = compile(self.code_to_run, "<program>", "exec")
+            code = _compile(self.code_to_run, "<program>", "exec")
             exec(code, self.symbols)
         except KeyboardInterrupt:
             self.screen.writestr("\naborted.\n")
@@ -170,8 +189,9 @@ class PythonInterpreter:
         if not arg.endswith(".py"):
             arg += ".py"
         self.screen.writestr("\nsaving " + arg)
-        with open("drive8/" + arg, "w", encoding="utf8") as file:
-            file.write(self.program)
+        data = self.program.encode("utf8")
+        with open("drive8/" + arg, "wb") as file:
+            file.write(data)
 
     def execute_run(self, arg=None):
         arg = arg or self.program
@@ -191,43 +211,34 @@ class PythonInterpreter:
         if x is None and y is None and dx is None and dy is None and color is None and enabled is None and pointer is None:
             # return sprite info instead
             return self.screen.getsprites([spritenum], bitmap=False)[spritenum]
+        memory = self.screen.memory
+        bit = 1 << spritenum
         if x is not None:
             x = int(x)
-            self.screen.memory[53248 + spritenum * 2] = x & 255
-            xmsb = self.screen.memory[53264]
-            if x > 255:
-                self.screen.memory[53264] = xmsb | 1 << spritenum
-            else:
-                self.screen.memory[53264] = xmsb & ~(1 << spritenum)
+            memory[53248 + spritenum * 2] = x & 255
+            xmsb = memory[53264]
+            memory[53264] = xmsb | bit if x > 255 else xmsb & ~bit
         if y is not None:
-            self.screen.memory[53249 + spritenum * 2] = int(y) & 255
+            memory[53249 + spritenum * 2] = int(y) & 255
         if dx is not None:
-            flag = self.screen.memory[53277]
-            if dx:
-                self.screen.memory[53277] = flag | 1 << spritenum
-            else:
-                self.screen.memory[53277] = flag & ~(1 << spritenum)
+            flag = memory[53277]
+            memory[53277] = flag | bit if dx else flag & ~bit
         if dy is not None:
-            flag = self.screen.memory[53271]
-            if dy:
-                self.screen.memory[53271] = flag | 1 << spritenum
-            else:
-                self.screen.memory[53271] = flag & ~(1 << spritenum)
+            flag = memory[53271]
+            memory[53271] = flag | bit if dy else flag & ~bit
         if color is not None:
-            self.screen.memory[53287 + spritenum] = int(color)
+            memory[53287 + spritenum] = int(color)
         if enabled is not None:
-            flag = self.screen.memory[53269]
-            if enabled:
-                self.screen.memory[53269] = flag | 1 << spritenum
-            else:
-                self.screen.memory[53269] = flag & ~(1 << spritenum)
+            flag = memory[53269]
+            memory[53269] = flag | bit if enabled else flag & ~bit
         if pointer is not None:
             if pointer & 63:
                 raise ValueError("sprite pointer must be 64-byte aligned")
-            self.screen.memory[2040 + spritenum] = pointer // 64
+            memory[2040 + spritenum] = pointer // 64
 
-    def check_run_stop(self, continuation, *args, **kwargs):
+    def execute_sync(self):
+        # called from loops in user programs, so it checks the run/stop flag directly instead of wrapping a continuation
         if self.must_run_stop:
             self.must_run_stop = False
             raise KeyboardInterrupt("run/stop")
-        continuation(*args, **kwargs)
+        self.interactive.do_sync_command()
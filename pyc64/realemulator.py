@@ -56,24 +56,30 @@ class RealC64EmulatorWindow(C64EmulatorWindow):
         previous_cycles = 0
         mem = self.screen.memory
         old_raster = 0
+        next_raster_cycles = 0   # cycle count at which the raster line changes next
         while True:
             irq_start_time = time.perf_counter()
-            while time.perf_counter() - irq_start_time < 1.0 / 60.0:
+            irq_due_time = irq_start_time + 1.0 / 60.0
+            while time.perf_counter() < irq_due_time:
                 for _ in range(1000):
                     cpu.step()
                     if cpu.pc == 0xFFD8:
                         self.breakpointKernelSave(cpu, mem)
                     elif cpu.pc == 0xffd5:
                         self.breakpointKernelLoad(cpu, mem)
-                    # set the raster line based off the number of CPU cycles processed
-                    raster = (cpu.processorCycles // 63) % 312
-                    if raster != old_raster:
-                        mem[53266] = raster and 255
-                        high = mem[53265] & 0b01111111
-                        if raster > 255:
-                            high |= 0b10000000
-                        mem[53265] = high
-                        old_raster = raster
+                    # set the raster line based off the number of CPU cycles processed,
+                    # it changes only every 63 cycles so there's nothing to compute until then.
+                    if cpu.processorCycles >= next_raster_cycles:
+                        lines = cpu.processorCycles // 63
+                        next_raster_cycles = (lines + 1) * 63
+                        raster = lines % 312
+                        if raster != old_raster:
+                            mem[53266] = raster & 255
+                            high = mem[53265] & 0b01111111
+                            if raster > 255:
+                                high |= 0b10000000
+                            mem[53265] = high
+                            old_raster = raster
                 time.sleep(0.001)
             self.irq(cpu)
             duration = time.perf_counter() - irq_start_time
@@ -267,6 +273,24 @@ class RealC64EmulatorWindow(C64EmulatorWindow):
         '9': 0x00,
     }
 
+    # special keys, mapped to their petscii code (unshifted, shifted)
+    keysym_petscii = {
+        "Home": (0x13, 0x93),   # clear/home
+        "Up": (0x91, 0x91),
+        "Down": (0x11, 0x11),
+        "Left": (0x9d, 0x9d),
+        "Right": (0x1d, 0x1d),
+        "Insert": (0x94, 0x94),
+        "F1": (0x85, 0x85),
+        "F2": (0x86, 0x86),
+        "F3": (0x87, 0x87),
+        "F4": (0x88, 0x88),
+        "F5": (0x89, 0x89),
+        "F6": (0x8a, 0x8a),
+        "F7": (0x8b, 0x8b),
+        "F8": (0x8c, 0x8c),
+    }
+
     def simulate_keystrokes(self):
         if not self.keypresses:
             return
@@ -290,34 +314,8 @@ class RealC64EmulatorWindow(C64EmulatorWindow):
                 petscii = 0x14  # backspace ('delete')
             elif char == '\x1b':
                 petscii = 0x83 if with_shift else 0x03
-            elif event.keysym == "Home":
-                petscii = 0x93 if with_shift else 0x13  # clear/home
-            elif event.keysym == "Up":
-                petscii = 0x91
-            elif event.keysym == "Down":
-                petscii = 0x11
-            elif event.keysym == "Left":
-                petscii = 0x9d
-            elif event.keysym == "Right":
-                petscii = 0x1d
-            elif event.keysym == "Insert":
-                petscii = 0x94
-            elif event.keysym == "F1":
-                petscii = 0x85
-            elif event.keysym == "F2":
-                petscii = 0x86
-            elif event.keysym == "F3":
-                petscii = 0x87
-            elif event.keysym == "F4":
-                petscii = 0x88
-            elif event.keysym == "F5":
-                petscii = 0x89
-            elif event.keysym == "F6":
-                petscii = 0x8a
-            elif event.keysym == "F7":
-                petscii = 0x8b
-            elif event.keysym == "F8":
-                petscii = 0x8c
+            elif event.keysym in self.keysym_petscii:
+                petscii = self.keysym_petscii[event.keysym][1 if with_shift else 0]
             elif (event.keycode == 50 and with_alt) or (event.keycode == 64 and with_shift):
                 charset = self.screen.memory[0xd018] & 0b00000010
                 petscii = 0x8e if charset else 0x0e
@@ -0,0 +1,156 @@
+import unittest
+from pyc64.memory import Memory, ScreenAndMemory
+
+
+class ScreenAndMemoryTest(unittest.TestCase):
+    def test_getdirty_full_repaint(self):
+        screen = ScreenAndMemory()
+        indexes, chars, colors = screen.getdirty()
+        self.assertEqual(1000, len(indexes))
+        self.assertEqual(list(range(1000)), list(indexes))
+        self.assertEqual(1000, len(chars))
+        self.assertEqual(1000, len(colors))
+
+    def test_getdirty_changes(self):
+        screen = ScreenAndMemory()
+        screen.getdirty()
+        indexes, chars, colors = screen.getdirty()
+        self.assertEqual(0, len(indexes))
+        screen.memory[0x0400 + 5] = 1
+        screen.memory[0xd800 + 900] = 2
+        indexes, chars, colors = screen.getdirty()
+        self.assertEqual([5, 900], list(indexes))
+        self.assertEqual([1, 32], list(chars))
+        self.assertEqual([14, 2], list(colors))
+        indexes, chars, colors = screen.getdirty()
+        self.assertEqual(0, len(indexes))
+
+    def test_move_cursor(self):
+        screen = ScreenAndMemory()
+        screen.cursormove(5, 5)
+        screen.move(3, -2)
+        self.assertEqual((8, 3), screen.cursorpos())
+        screen.move(-1000, 0)
+        self.assertEqual((0, 0), screen.cursorpos())
+        screen.move(0, 100)
+        self.assertEqual((39, 24), screen.cursorpos())
+        screen.right()
+        self.assertEqual((0, 24), screen.cursorpos())
+
+    def test_cursormove_off_screen(self):
+        screen = ScreenAndMemory()
+        screen.cursormove(39, 25)     # what the End key does on the bottom line
+        self.assertEqual((39, 24), screen.cursorpos())
+        screen.blink_cursor()
+        screen.blink_cursor()
+        screen.cursormove(40, 3)
+        self.assertEqual((0, 4), screen.cursorpos())
+        screen.cursormove(-5, 0)
+        self.assertEqual((0, 0), screen.cursorpos())
+
+    def test_cursor_right_at_last_cell(self):
+        screen = ScreenAndMemory()
+        screen.memory[0x0400 + 40] = 1   # 'a' on the second line
+        screen.cursormove(39, 24)
+        screen.write(b"\x1d,")
+        self.assertEqual((1, 24), screen.cursorpos())
+        self.assertEqual(1, screen.memory[0x0400])    # the screen has scrolled up one line
+        self.assertEqual(44, screen.memory[0x0400 + 960])    # ',' is written at the start of the last line
+        self.assertEqual(32, screen.memory[0x0400 + 999])
+
+    def test_write_with_cursor_past_the_end(self):
+        screen = ScreenAndMemory()
+        screen.cursor_enabled = False
+        screen.memory[0x0400 + 40] = 1   # 'a' on the second line
+        screen.cursor = 1005
+        screen.write(b"BC")
+        self.assertEqual((2, 24), screen.cursorpos())
+        self.assertEqual(1, screen.memory[0x0400])    # the screen has scrolled up one line
+        self.assertEqual(b"\x02\x03 ", screen.memory[0x0400 + 960: 0x0400 + 963])
+
+    def test_jiffieclock(self):
+        screen = ScreenAndMemory()
+        screen.memory[160] = 1
+        screen.memory[161] = 2
+        screen.memory[162] = 3
+        jiffies = screen.memory[160] << 16 | screen.memory[161] << 8 | screen.memory[162]
+        self.assertTrue(0x010203 <= jiffies < 0x010203 + screen.hz)
+
+
+class MemoryTest(unittest.TestCase):
+    def test_single_addresses(self):
+        memory = Memory()
+        memory[100] = 42
+        self.assertEqual(42, memory[100])
+        memory.intercept_write(200, lambda address, oldval, newval: newval + 1)
+        memory.intercept_read(200, lambda address, value: value * 2)
+        memory[200] = 10
+        self.assertEqual(11, memory.mem[200])
+        self.assertEqual(22, memory[200])
+        memory.rom_areas.add((0xe000, 0xffff))
+        memory[0xe000] = 99
+        self.assertEqual(0, memory[0xe000])
+
+    def test_hooked_slices(self):
+        memory = Memory()
+        memory.intercept_read(300, lambda address, value: 7)
+        self.assertEqual(bytearray(10), memory[290:300])
+        self.assertEqual([0] * 10 + [7], memory[290:301])
+        self.assertEqual([0, 0, 7], memory[280:301:10])
+        memory.intercept_write(400, lambda address, oldval, newval: 9)
+        memory[398:402] = 1
+        self.assertEqual(b"\x01\x01\x09\x01", memory[398:402])
+
+    def test_rom_slices(self):
+        memory = Memory()
+        memory.rom_areas.add((0x100, 0x1ff))
+        memory[0xf0:0x110] = 7
+        self.assertEqual(b"\x07" * 16 + bytes(16), memory[0xf0:0x110])
+        memory[:0x10] = 5
+        self.assertEqual(b"\x05" * 16, memory[0:0x10])
+        memory[0x1f8:0x208] = bytes(range(16))
+        self.assertEqual(bytes(8) + bytes(range(8, 16)), memory[0x1f8:0x208])
+        memory[0x210:0x1f0:-4] = 9
+        self.assertEqual(b"\x09" * 5 + bytes(3), memory[0x210:0x1f0:-4])
+
+    def test_empty_slices(self):
+        memory = Memory()
+        memory[10:5:2] = 0
+        memory[152:152:2] = b""
+        memory[300:300] = b""
+        self.assertEqual(bytearray(65536), memory.mem)
+        with self.assertRaises(ValueError):
+            memory[10:5:2] = b"x"
+
+    def test_clear(self):
+        memory = Memory()
+        memory[0:0x10000] = 0x55
+        written = []
+        memory.intercept_write(0x1000, lambda address, oldval, newval: written.append(address) or 3)
+        memory.rom_areas.add((0xe000, 0xffff))
+        memory.clear()
+        self.assertEqual([0x1000], written)
+        self.assertEqual(3, memory[0x1000])
+        self.assertEqual(bytearray(0x1000), memory[0:0x1000])
+        self.assertEqual(bytearray(0xe000 - 0x1001), memory[0x1001:0xe000])
+        self.assertEqual(b"\x55" * 0x2000, memory[0xe000:0x10000])
+
+    def test_words_and_longs(self):
+        memory = Memory()
+        memory.setword(100, 0x1234)
+        self.assertEqual(b"\x34\x12", memory[100:102])
+        self.assertEqual(0x1234, memory.getword(100))
+        memory.setword(100, -2, signed=True)
+        self.assertEqual(-2, memory.getword(100, signed=True))
+        self.assertEqual(0xfffe, memory.getword(100))
+        memory.setlong(200, 0x12345678)
+        self.assertEqual(0x12345678, memory.getlong(200))
+        memory = Memory(endian="big")
+        memory.setword(100, 0x1234)
+        self.assertEqual(b"\x12\x34", memory[100:102])
+        memory.setlong(200, -5, signed=True)
+        self.assertEqual(-5, memory.getlong(200, signed=True))
+
+
+if __name__ == '__main__':
+    unittest.main()